@@ -1,5 +1,10 @@
 import logger from "../utils/logger.js";
+import { memoize } from "../utils/memoize.js";
 
+//identifiers repeat a lot (FKs, indexes, constraints), so remember the sanitized form..!
+const SANITIZE_RE = /[^a-zA-Z0-9_]/g;
+const SANITIZE_CACHE_SIZE = 4096;
+const sanitize = memoize(name => name.replace(SANITIZE_RE, '_'), SANITIZE_CACHE_SIZE);
 
 export class BaseGenerator {
     constructor(metadata, outputDir) {
@@ -10,35 +15,51 @@ export class BaseGenerator {
 
     }
     sanitizeName(name) {
-        return name.replace(/[^a-zA-Z0-9_]/g, '_');
+        return sanitize(name);
     }
 
 
     generateDDL() {
+        //return the whole parts and join with \n(new line)..!
+        return Array.from(this.generateDDLParts()).join('\n');
+    }
+
+    /**
+     * Same DDL as generateDDL() but as newline-joined chunks, so it can be streamed to disk..!
+     */
+    *generateDDLChunks() {
+        let first = true;
+        for (const part of this.generateDDLParts()) {
+            yield first ? part : `\n${part}`;
+            first = false;
+        }
+    }
+
+    *generateDDLParts() {
         /**
          * we are going to generate the DDL for the database..!
          * As the ddl will be a combination of the header,drops,create table,foreign keys,indexes..!
          * IS the template for the base-generator..!
          * we will use this base-to use in child classes..!
+         * Parts are yielded one by one (instead of an array) so big schemas never sit in memory twice..!
          */
-        const parts = [];//empty array..!
-        parts.push(this.generateHeader());
-        parts.push('');
-        parts.push(this.generateDrops());
-        parts.push('');
+        yield this.generateHeader();
+        yield '';
+        yield this.generateDrops();
+        yield '';
 
         //generation of the tables..!
         for (const table of this.metadata.tables.values()) {
-            parts.push(this.generateCreateTable(table));
-            parts.push('');
+            yield this.generateCreateTable(table);
+            yield '';
 
         }
         //generation of the foreign keys..!
         for (const table of this.metadata.tables.values()) {
             const fks = this.generateForeignKeys(table);
             if (fks.length > 0) {
-                parts.push(fks);
-                parts.push('');
+                yield fks;
+                yield '';
             }
         }
         //generation of indexs..!   
@@ -47,15 +68,13 @@ export class BaseGenerator {
             if (indexs && indexs.length > 0) {
                 // If indexes is an array, join with newlines
                 if (Array.isArray(indexs)) {
-                    parts.push(indexs.join('\n'));
+                    yield indexs.join('\n');
                 } else {
-                    parts.push(indexs);
+                    yield indexs;
                 }
-                parts.push('');
+                yield '';
             }
         }
-        //return the whole parts and join with \n(new line)..!A
-        return parts.join('\n');
     }
     generateHeader() {
         return `-- Generated by Phase-2 MySQL Physical Model Generator (Node.js)
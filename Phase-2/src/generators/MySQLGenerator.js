@@ -1,5 +1,8 @@
 import path from 'path';
-import { writeFile } from 'fs/promises';
+import { createWriteStream } from 'fs';
+import { rename, unlink } from 'fs/promises';
+import { Readable } from 'stream';
+import { pipeline } from 'stream/promises';
 import { BaseGenerator } from './BaseGenerator.js';
 import { mapToMySQLType } from './typeMapper.js';
 
@@ -28,10 +31,6 @@ export class MySQLGenerator extends BaseGenerator {
     return `\`${name}\``;
   }
 
-  sanitizeName(name) {
-    return name.replace(/[^a-zA-Z0-9_]/g, '_');
-  }
-
   cleanIdentifier(name) {
     let n = this.sanitizeName(String(name || '')).replace(/^_+/, '');
     
@@ -338,18 +337,11 @@ export class MySQLGenerator extends BaseGenerator {
     // Add timestamps (PDM requirement)
     this.ensureTimestampColumns(table);
 
-    const lines = [`CREATE TABLE ${this.q(cleanTableName)} (`];
-    const defs = [];
-
-    for (const col of table.columns) {
-      defs.push(`  ${this.generateColumnDefinition(col)}`);
-    }
+    const columnDefs = table.columns.map(col => `  ${this.generateColumnDefinition(col)}`);
 
     // PK constraint
     const pkCols = table.primaryKeys.map(pk => this.q(this.cleanIdentifier(pk.name)));
-    if (pkCols.length > 0) {
-      defs.push(`  PRIMARY KEY (${pkCols.join(', ')})`);
-    }
+    const constraints = pkCols.length > 0 ? [`  PRIMARY KEY (${pkCols.join(', ')})`] : [];
 
     // STEP 4: Add UNIQUE constraints
     const tableLower = cleanTableName.toLowerCase();
@@ -359,13 +351,13 @@ export class MySQLGenerator extends BaseGenerator {
         // Verify columns exist before adding constraint
         const colNames = table.columns.map(c => this.cleanIdentifier(c.name).toLowerCase());
         if (colNames.includes('portfolio_id') && colNames.includes('as_of_date')) {
-            defs.push(`  UNIQUE (\`portfolio_id\`, \`as_of_date\`)`);
+            constraints.push(`  UNIQUE (\`portfolio_id\`, \`as_of_date\`)`);
         }
     }
 
-    lines.push(defs.join(',\n'));
-    lines.push(`) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;`);
-    return lines.join('\n');
+    return `CREATE TABLE ${this.q(cleanTableName)} (
+${columnDefs.concat(constraints).join(',\n')}
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;`;
   }
 
   generateForeignKeys(table) {
@@ -443,9 +435,18 @@ export class MySQLGenerator extends BaseGenerator {
   }
 
   async save(filename = 'mysql.sql') {
-    const ddl = this.generateDDL();
     const outPath = path.join(this.outputDir, filename);
-    await writeFile(outPath, ddl, 'utf-8');
+    const tmpPath = `${outPath}.tmp`;
+    // Stream statement by statement instead of building the whole script in memory first.
+    // Write to a temp file and rename on success, so a failed run never leaves a truncated
+    // mysql.sql behind (callers skip generation when that file exists).
+    try {
+      await pipeline(Readable.from(this.generateDDLChunks()), createWriteStream(tmpPath, 'utf-8'));
+      await rename(tmpPath, outPath);
+    } catch (error) {
+      await unlink(tmpPath).catch(() => {});
+      throw error;
+    }
     this.logger.info({ filePath: outPath }, 'MySQL DDL saved successfully');
     return outPath;
   }
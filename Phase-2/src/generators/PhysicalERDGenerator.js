@@ -104,6 +104,16 @@ function convertMetadataToDOT(metadata, settings) {
 
     // Helpers (mirror MySQLGenerator display rules)
     const cleanName = (name) => String(name || '').replace(/^_+/, '').replace(/[^a-zA-Z0-9_]/g, '_');
+    // Node names are needed for every table and again for every FK edge, compute each once
+    const nodeNames = new Map();
+    const nodeName = (name) => {
+        let n = nodeNames.get(name);
+        if (n === undefined) {
+            n = name.replace(/[^a-zA-Z0-9_]/g, '_').replace(/^_+/, '');
+            nodeNames.set(name, n);
+        }
+        return n;
+    };
     const isEmailUnique = (n) => n.toLowerCase() === 'email';
     const shouldBeNotNull = (col, n) => {
         if (col.isPrimaryKey) return true;
@@ -127,19 +137,22 @@ function convertMetadataToDOT(metadata, settings) {
         return null;
     };
     
-    let dot = 'digraph PhysicalERD {\n';
-    dot += `  graph [dpi=${settings.dpi}, size="${settings.size}", nodesep=${settings.nodesep}, ranksep=${settings.ranksep}];\n`;
-    dot += `  node [shape=record, fontsize=${settings.fontsize}];\n`;
-    dot += `  edge [fontsize=${settings.fontsize - 2}];\n\n`;
+    const lines = [
+        'digraph PhysicalERD {',
+        `  graph [dpi=${settings.dpi}, size="${settings.size}", nodesep=${settings.nodesep}, ranksep=${settings.ranksep}];`,
+        `  node [shape=record, fontsize=${settings.fontsize}];`,
+        `  edge [fontsize=${settings.fontsize - 2}];`,
+        ''
+    ];
     
-    // Add tables
-    const tablesArray = Array.from(metadata.tables.values());
-    for (const table of tablesArray) {
-        const tableName = table.name.replace(/[^a-zA-Z0-9_]/g, '_').replace(/^_+/, '');
+    // Add tables and their relationships in one walk (edges are emitted after all nodes)
+    const edges = [];
+    for (const table of metadata.tables.values()) {
+        const tableName = nodeName(table.name);
         const columns = filterColumnsForDisplay(table.columns, maxColumnsPerTable);
         const filteredCount = table.columns.length - columns.length;
         
-        let label = `{<header>${table.name}`;
+        const cells = [`<header>${table.name}`];
         
         for (const col of columns) {
             const colName = cleanName(col.name);
@@ -169,44 +182,38 @@ function convertMetadataToDOT(metadata, settings) {
             // Escape record label special chars to avoid Graphviz parse errors
             const colLabelSafe = colLabel.replace(/([{}|<>])/g, '\\$1');
             
-            label += `|${colLabelSafe}`;
+            cells.push(colLabelSafe);
         }
         
         if (filteredCount > 0) {
-            label += `|... +${filteredCount} more columns`;
+            cells.push(`... +${filteredCount} more columns`);
         }
         
-        label += '}';
+        const label = `{${cells.join('|')}}`;
         
-        dot += `  "${tableName}" [label="${label.replace(/"/g, '\\"')}"];\n`;
-    }
-    
-    dot += '\n';
-    
-    // Add relationships with referential actions
-    for (const table of tablesArray) {
-        const tableName = table.name.replace(/[^a-zA-Z0-9_]/g, '_').replace(/^_+/, '');
+        lines.push(`  "${tableName}" [label="${label.replace(/"/g, '\\"')}"];`);
         
+        // Relationships with referential actions
         for (const col of table.columns) {
             if (col.isForeignKey && col.referencesTable && col.referencesColumn) {
-                const refTable = col.referencesTable.replace(/[^a-zA-Z0-9_]/g, '_').replace(/^_+/, '');
+                const refTable = nodeName(col.referencesTable);
                 const cleanFkName = col.name.replace(/^_+/, '');
                 
                 // Determine referential action for label
                 const isChildTable = table.name.toLowerCase().includes('item') || table.name.toLowerCase().includes('detail');
                 const deleteAction = isChildTable ? 'CASCADE' : 'RESTRICT';
                 
-                dot += `  "${refTable}" -> "${tableName}" [` +
+                edges.push(`  "${refTable}" -> "${tableName}" [` +
                        `label="${cleanFkName}\\nON DELETE ${deleteAction}\\nON UPDATE CASCADE", ` +
                        `taillabel="1", headlabel="N", labeldistance=2, labelfontsize=${settings.fontsize - 2}` +
-                       `];\n`;
+                       `];`);
             }
         }
     }
     
-    dot += '}\n';
+    lines.push('', ...edges, '}', '');
     
-    return dot;
+    return lines.join('\n');
 }
 
 /**
@@ -1,3 +1,5 @@
+import { memoize } from '../utils/memoize.js';
+
 const MYSQL_TYPE_MAP = {
     /**
      * The variations of the mapping here..!
@@ -26,6 +28,10 @@ const MYSQL_TYPE_MAP = {
     'REAL': 'DOUBLE'
 };
 
+//only a handful of distinct types per schema, so remember the mapping per raw type..!
+const TYPE_CACHE_SIZE = 128;
+const resolveCachedType = memoize(resolveMySQLType, TYPE_CACHE_SIZE);
+
 /**
  * Map generic type to MySQL type with precision
  * Physical model MUST specify exact SQL types with precision
@@ -35,7 +41,11 @@ const MYSQL_TYPE_MAP = {
  */
 export function mapToMySQLType(genericType, isPrimaryKey = false) {
     if (!genericType) return 'VARCHAR(255)';
-    
+
+    return resolveCachedType(genericType);
+}
+
+function resolveMySQLType(genericType) {
     const normalized = String(genericType).toUpperCase().trim();
     
     // If it already has precision (e.g. DECIMAL(10,6)), return it as is (but normalize INTEGER -> INT)
@@ -98,11 +98,12 @@ if (!fileId) {
     process.exit(1);
 }
 
-generatePhysicalModel(fileId)
-    .then(() => process.exit(0))
-    .catch(error => {
-        logger.error(`Generation failed: ${error.message}`);
-        console.error(`\n❌ Error: ${error.message}`);
-        process.exit(1);
-    });
+// Let the event loop drain on its own (pending writes/logs finish) instead of forcing process.exit()
+try {
+    await generatePhysicalModel(fileId);
+} catch (error) {
+    logger.error(`Generation failed: ${error.message}`);
+    console.error(`\n❌ Error: ${error.message}`);
+    process.exitCode = 1;
+}
 
@@ -0,0 +1,21 @@
+/**
+ * Remember the results of a one-argument function (names/types repeat a lot within a schema)..!
+ * The cache is simply dropped once it holds max entries, so it can't grow without bound.
+ * @param {Function} fn - Pure function of a single argument
+ * @param {number} max - Most results kept at once
+ * @returns {Function} Memoized function
+ */
+export function memoize(fn, max) {
+    const cache = new Map();
+    return (arg) => {
+        let result = cache.get(arg);
+        if (result === undefined) {
+            result = fn(arg);
+            if (cache.size >= max) {
+                cache.clear();
+            }
+            cache.set(arg, result);
+        }
+        return result;
+    };
+}
@@ -11,6 +11,15 @@ dotenv.config();
 const __filename = fileURLToPath(import.meta.url);//import.meta.url the path of current-file..!
 const __dirname = dirname(__filename);//the current directory of the current file.!
 
+/**
+ * Read a count from the env: anything that isn't a number falls back to the default, and never go below 1
+ * (a pool of 0 browsers would leave every render waiting forever)..!
+ */
+const positiveInt = (value, fallback) => {
+    const parsed = parseInt(value, 10);
+    return Number.isNaN(parsed) ? fallback : Math.max(1, parsed);
+};
+
 
 const config = {
     //all the configs of the root..!
@@ -34,6 +43,23 @@ const config = {
         provider: "ollama",
         ollamaUrl: process.env.OLLAMA_URL || "http://localhost:11434",
         model: process.env.OLLAMA_MODEL || "deepseek-r1:7b",
+    },
+    //ERD rendering (Puppeteer)..!
+    erd: {
+        executablePath: process.env.PUPPETEER_EXECUTABLE_PATH || 'C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe',
+        browserPoolSize: positiveInt(process.env.POOL_SIZE, 2),//number of warm browsers..!
+        browserPoolRecycleAfter: positiveInt(process.env.BROWSER_POOL_RECYCLE_AFTER, 100),//relaunch after N renders..!
+        batchConcurrency: positiveInt(process.env.ERD_BATCH_CONCURRENCY, 4),//pages open at once in batch mode..!
+        formatTimeoutMs: positiveInt(process.env.ERD_FORMAT_TIMEOUT_MS, 10000),//time budget per PNG/PDF/SVG export..!
+        //rendered images keyed by hash of the Mermaid source (shared by all uploads)..!
+        cacheDir: process.env.ERD_CACHE_DIR || join(__dirname, "../.mermaid-cache"),
+        cacheMaxEntries: positiveInt(process.env.ERD_CACHE_MAX_ENTRIES, 500),//oldest diagrams are pruned past this..!
+        //'puppeteer' renders in the pooled browsers, 'mmdc' shells out to @mermaid-js/mermaid-cli..!
+        renderer: process.env.ERD_RENDERER || "puppeteer",
+        //Mermaid bundle inlined into the render page (set ERD_MERMAID_CDN=true to load it from jsdelivr instead)..!
+        mermaidScriptPath: process.env.MERMAID_JS_PATH || join(__dirname, "../../node_modules/mermaid/dist/mermaid.min.js"),
+        mermaidCdn: process.env.ERD_MERMAID_CDN === "true",
+        mmdcPath: process.env.MMDC_PATH || join(__dirname, "../../node_modules/.bin", process.platform === "win32" ? "mmdc.cmd" : "mmdc"),
     }
 }
 
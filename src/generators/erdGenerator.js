@@ -4,10 +4,14 @@
  * Uses Mermaid.js + Puppeteer to generate PNG, SVG, and PDF
  */
 
-import { writeFile } from 'fs/promises';//to write things.!
+import { writeFile, copyFile, mkdir, rename, readdir, stat, unlink } from 'fs/promises';//to write things.!
+import { existsSync, readFileSync } from 'fs';
+import { createHash, randomUUID } from 'crypto';
+import { execFile } from 'child_process';
+import { promisify } from 'util';
 import path, { join } from 'path';//For the Path..!
-import puppeteer from 'puppeteer';
 import logger from '../utils/logger.js';
+import browserPool, { CHROMIUM_ARGS } from '../utils/browserPool.js';
 import config from '../config/index.js';
 
 
@@ -25,8 +29,6 @@ export async function generateMermaidERD(metadata) {
             fileId: metadata.fileId,
         }, 'Generating Mermaid ERD from metadata..!');
 
-        let mermaid = 'erDiagram\n';
-
         //get the tables from the metadata-nested-one..!
         const tables = metadata.metadata.tables;
 
@@ -35,16 +37,18 @@ export async function generateMermaidERD(metadata) {
             throw new Error('No tables found in metadata');
         };
 
-        //generate entity Description..!
+        //Show ALL columns (no limit) - configurable via environment
+        const columnLimit = parseInt(process.env.ERD_COLUMN_LIMIT || '9999', 10);
+
+        //generate entity Description + relationships in a single walk..!
         //iterate over each tableName and Data in tables..!
+        const entities = [];
+        const relationships = [];
         for (const [tableName, tableData] of Object.entries(tables)) {
-            mermaid += generateMermaidEntity(tableName, tableData);
+            generateMermaidTable(tableName, tableData, columnLimit, entities, relationships);
         }
 
-        mermaid += '\n    %% Relationships\n';
-        for (const [tableName, tableData] of Object.entries(tables)) {
-            mermaid += generateMermaidRelationships(tableName, tableData);
-        }
+        const mermaid = 'erDiagram\n' + entities.join('') + '\n    %% Relationships\n' + relationships.join('');
         logger.info({
             fileId: metadata.fileId,
         },
@@ -62,195 +66,521 @@ export async function generateMermaidERD(metadata) {
 }
 
 /**
- * Generate Mermaid entity definition
+ * Generate the Mermaid entity definition and relationships of one table
+ * (entity goes to entities, relationships go to relationships)
  */
 
-function generateMermaidEntity(tableName, tableData) {
-    let mermaid = `    ${sanitizeMermaidName(tableName)} {\n`;
-    
-    //Show ALL columns (no limit) - configurable via environment
-    const columnLimit = parseInt(process.env.ERD_COLUMN_LIMIT || '9999', 10);
-    const columnsToShow = tableData.columns.slice(0, columnLimit);
-    
-    for (const column of columnsToShow) {
-        //get the datatype or take the varchar only..!
-        const dataType = (column.dataType || 'VARCHAR').toLowerCase();
-        const colName = sanitizeMermaidName(column.columnName);
-
-        /**
-         * After we have pushed the columnname and data-Type...!
-         * we can start pushing the attrtibutes..!
-         */
-        let attributes = [];
-        if (column.isPrimaryKey) attributes.push("PK");
-        if (column.isForeignKey) attributes.push("FK");
-
-        //if the length is > 0 join with "," else empty..!
-        const attrStr = attributes.length > 0 ? ` "${attributes.join(',')}"` : '';
-        mermaid += `        ${dataType} ${colName}${attrStr}\n`;
+//so the relationships are basically the flow from source to destination..!
+
+function generateMermaidTable(tableName, tableData, columnLimit, entities, relationships) {
+    const entityName = sanitizeMermaidName(tableName);
+    const lines = [`    ${entityName} {`];
+
+    //one pass over the columns for both the entity and its relationships..!
+    for (let index = 0; index < tableData.columns.length; index++) {
+        const column = tableData.columns[index];
+
+        if (index < columnLimit) {
+            //get the datatype or take the varchar only..!
+            const dataType = (column.dataType || 'VARCHAR').toLowerCase();
+            const colName = sanitizeMermaidName(column.columnName);
+
+            /**
+             * After we have pushed the columnname and data-Type...!
+             * we can start pushing the attrtibutes..!
+             */
+            let attributes = [];
+            if (column.isPrimaryKey) attributes.push("PK");
+            if (column.isForeignKey) attributes.push("FK");
+
+            //if the length is > 0 join with "," else empty..!
+            const attrStr = attributes.length > 0 ? ` "${attributes.join(',')}"` : '';
+            lines.push(`        ${dataType} ${colName}${attrStr}`);
+        }
+
+        if (column.isForeignKey && column.referencesTable && column.referencesColumn) {
+            const toTable = sanitizeMermaidName(column.referencesTable);
+
+            //many to one relationship..!
+            relationships.push(`    ${entityName} }o--|| ${toTable} : "references"\n`);
+        }
     }
     
     if (tableData.columns.length > columnLimit) {
         //if more than limit then show remaining count..!
-        mermaid += `        string "... ${tableData.columns.length - columnLimit} more columns"\n`;
+        lines.push(`        string "... ${tableData.columns.length - columnLimit} more columns"`);
     }
 
-    mermaid += '    }\n\n';
+    //closing brace followed by a blank line..!
+    lines.push('    }', '', '');
 
-    return mermaid;
+    entities.push(lines.join('\n'));
 }
 
+//it should be from a-z-A-Z 0-9 and underscore..!
+const MERMAID_NAME_RE = /[^a-zA-Z0-9_]/g;
+const MERMAID_NAME_CACHE_SIZE = 4096;
+const mermaidNameCache = new Map();
+
 /**
- * Generate Mermaid relationships
+ * Sanitize name for Mermaid (remove spaces and special chars)
+ * Memoized since table names repeat in every relationship..!
  */
+function sanitizeMermaidName(name) {
+    let sanitized = mermaidNameCache.get(name);
+    if (sanitized === undefined) {
+        sanitized = name.replace(MERMAID_NAME_RE, '_');
+        if (mermaidNameCache.size >= MERMAID_NAME_CACHE_SIZE) {
+            mermaidNameCache.clear();
+        }
+        mermaidNameCache.set(name, sanitized);
+    }
+    return sanitized;
+}
 
-//so its basically the  flow from source to destination..!s
+//Mermaid settings used by the rendering page..!
+const MERMAID_CONFIG = {
+    startOnLoad: true,
+    theme: 'default',
+    er: {
+        fontSize: 14,
+        useMaxWidth: true
+    }
+};
+//same Mermaid as package-lock.json, used by the CDN fallback when node_modules/mermaid can't be read..!
+const MERMAID_CDN_VERSION = '11.12.2';
+//bump when the page/export settings change so older cached images aren't reused..!
+const ERD_RENDER_VERSION = '2';
 
-function generateMermaidRelationships(tableName, tableData) {
-    let mermaid = '';
+let mermaidScript;
 
-    for (const column of tableData.columns) {
-        if (column.isForeignKey && column.referencesTable && column.referencesColumn) {
-            const fromTable = sanitizeMermaidName(tableName);
-            const toTable = sanitizeMermaidName(column.referencesTable);
+/**
+ * Version of the installed Mermaid package, so the CDN serves the same Mermaid as the local bundle..!
+ */
+function getMermaidVersion() {
+    const packagePath = join(path.dirname(config.erd.mermaidScriptPath), '../package.json');
+    return JSON.parse(readFileSync(packagePath, 'utf-8')).version;
+}
 
-            //many to one relationship..!
-            mermaid += `    ${fromTable} }o--|| ${toTable} : "references"\n`;
+/**
+ * Load the Mermaid bundle once: inline the local copy (no network per render),
+ * the CDN is only used when ERD_MERMAID_CDN=true or the local copy is missing..!
+ * @returns {{ html: string, version: string }} Script tags for the page + Mermaid version (part of the cache key)
+ */
+function getMermaidScript() {
+    if (mermaidScript) return mermaidScript;
+
+    const init = `mermaid.initialize(${JSON.stringify(MERMAID_CONFIG)});`;
+    if (!config.erd.mermaidCdn) {
+        let bundle;
+        try {
+            bundle = readFileSync(config.erd.mermaidScriptPath, 'utf-8');
+        } catch (error) {
+            logger.warn({ error: error.message, path: config.erd.mermaidScriptPath }, 'Local Mermaid bundle not found, using CDN');
+        }
+        if (bundle !== undefined) {
+            let version;
+            try {
+                version = getMermaidVersion();
+            } catch {
+                //vendored bundle (MERMAID_JS_PATH) without its package.json: its content identifies the version..!
+                version = `sha256-${createHash('sha256').update(bundle).digest('hex')}`;
+            }
+            //a literal </script> inside the bundle would close the tag early..!
+            const inlined = bundle.replace(/<\/script/gi, '<\\/script');
+            mermaidScript = {
+                html: `<script>${inlined}</script>\n    <script>${init}</script>`,
+                version,
+            };
+            return mermaidScript;
         }
     }
-    return mermaid;
+
+    let version = MERMAID_CDN_VERSION;
+    try {
+        version = getMermaidVersion();
+    } catch {
+        //not installed, keep the pinned version..!
+    }
+    mermaidScript = {
+        html: `<script type="module">
+        import mermaid from 'https://cdn.jsdelivr.net/npm/mermaid@${version}/dist/mermaid.esm.min.mjs';
+        ${init}
+    </script>`,
+        version,
+    };
+    return mermaidScript;
 }
 
+const execFileAsync = promisify(execFile);
+//.cmd shims can only be spawned through the shell on Windows (so quote the args there)..!
+const mmdcExecOptions = {
+    shell: process.platform === 'win32',
+    env: { ...process.env, PUPPETEER_EXECUTABLE_PATH: config.erd.executablePath },
+};
+const mmdcArg = (arg) => (mmdcExecOptions.shell ? `"${arg}"` : arg);
+
 /**
- * Sanitize name for Mermaid (remove spaces and special chars)
+ * Content-address of an ERD: same Mermaid source + same Mermaid version + same render settings => same images
+ * @param {string} backend - Renderer that produces the images ('mmdc' or 'puppeteer')
+ * @returns {{ digest: string, paths: Object }} Cache key + cache path per format
  */
-function sanitizeMermaidName(name) {
-    //it should be from a-z-A-Z 0-9 and underscore..!
-    return name.replace(/[^a-zA-Z0-9_]/g, '_');
+function getERDCacheKey(mermaidContent, backend) {
+    const digest = createHash('sha256')
+        .update(mermaidContent)
+        .update(getMermaidScript().version)
+        .update(ERD_RENDER_VERSION)
+        .update(backend)
+        .digest('hex');
+    const paths = {};
+    for (const format of ['svg', 'png', 'pdf']) {
+        paths[format] = join(config.erd.cacheDir, `${digest}.${format}`);
+    }
+    return { digest, paths };
 }
 
 /**
- * Generate ERD images (PNG, SVG, PDF) using Puppeteer
+ * Generate ERD images (PNG, SVG, PDF), reusing cached renders of the same diagram
+ * @param {Function} [options.getBrowser] - Hands out the browser to render on instead of borrowing one from the pool
+ * (only called when the diagram really has to be rendered with Puppeteer)
  */
 
-export async function generateERDImages(fileId, mermaidContent) {
-    let browser;
+export async function generateERDImages(fileId, mermaidContent, { getBrowser } = {}) {
+    //maek the path file here..!
+    const artifacts = join(config.storage.artifactsDir, fileId);
+    const outputs = {
+        svg: join(artifacts, 'erd.svg'),
+        png: join(artifacts, 'erd.png'),
+        pdf: join(artifacts, 'erd.pdf'),
+    };
 
     try {
         logger.info({
             fileId: fileId
         }, "Generating ERD Images..!")
 
-        //we will call the puppeter here..!
-        // Use MS Edge (already installed on Windows)
-        const edgePath = process.env.PUPPETEER_EXECUTABLE_PATH || 
-                        'C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe';
-        
-        logger.info({ fileId, browser: 'MS Edge' }, 'Using Microsoft Edge for rendering');
-        
-        browser = await puppeteer.launch({
-            headless: true,
-            executablePath: edgePath,
-            args: ['--no-sandbox', '--disable-setuid-sandbox'],
-        });
-        const page = await browser.newPage();//Try to open the new page..!
+        //key the cache on the renderer that will really be used (mmdc only if it resolves)..!
+        let backend = config.erd.renderer === 'mmdc' && await isMmdcAvailable() ? 'mmdc' : 'puppeteer';
+
+        //cache hit: the same diagram was already rendered, skip the browser entirely..!
+        //(with mmdc, a Puppeteer render stored by an earlier fallback counts too)..!
+        for (const candidate of backend === 'mmdc' ? ['mmdc', 'puppeteer'] : ['puppeteer']) {
+            const { digest, paths: cached } = getERDCacheKey(mermaidContent, candidate);
+            if (Object.values(cached).every(cachePath => existsSync(cachePath))) {
+                await Promise.all(Object.keys(outputs).map(format => copyFile(cached[format], outputs[format])));
+                logger.info({ fileId, digest, backend: candidate }, 'ERD images restored from cache');
+                return outputs;
+            }
+        }
+
+        if (backend === 'mmdc') {
+            try {
+                await renderERDImagesWithMmdc(fileId, mermaidContent, outputs);
+            } catch (error) {
+                //a failing mmdc run shouldn't fail the upload, Puppeteer can still render it..!
+                logger.warn({ error: error.message, fileId }, 'mmdc render failed, falling back to Puppeteer');
+                backend = 'puppeteer';
+            }
+        }
+        if (backend === 'puppeteer') {
+            await renderERDImages(fileId, mermaidContent, outputs, getBrowser);
+        }
+        //store under the key of the backend that actually rendered the images..!
+        await storeInERDCache(outputs, getERDCacheKey(mermaidContent, backend).paths);
+
+        return outputs;
+    } catch (error) {
+        logger.error({
+            error: error.message,
+            fileId: fileId,
+        }, 'Failed-to-Generate-ERD-Images..!')
+        throw error;
+    }
+}
+
+/**
+ * Copy freshly rendered images into the cache (failures only cost the next cache hit)
+ */
+async function storeInERDCache(outputs, cached) {
+    try {
+        await mkdir(config.erd.cacheDir, { recursive: true });
+        //copy then rename so a crash never leaves a half-written cache entry (unique temp name per writer)..!
+        await Promise.all(Object.keys(outputs).map(async format => {
+            const tmpPath = `${cached[format]}.${randomUUID()}.tmp`;
+            await copyFile(outputs[format], tmpPath);
+            await rename(tmpPath, cached[format]);
+        }));
+        await pruneERDCache();
+    } catch (error) {
+        logger.warn({ error: error.message }, 'Failed to store ERD images in cache');
+    }
+}
+
+//cache entries are <sha256>.<format>, anything else in the folder (temp files, mmdc config) is left alone..!
+const ERD_CACHE_FILE_RE = /^([0-9a-f]{64})\.(svg|png|pdf)$/;
+
+/**
+ * Keep the cache bounded: past config.erd.cacheMaxEntries diagrams, drop the oldest ones (all formats)
+ */
+async function pruneERDCache() {
+    const names = (await readdir(config.erd.cacheDir)).filter(name => ERD_CACHE_FILE_RE.test(name));
+    if (names.length <= config.erd.cacheMaxEntries * 3) return;
+
+    //digest -> { files, mtime } where mtime is the newest of its files..!
+    const entries = new Map();
+    await Promise.all(names.map(async name => {
+        const filePath = join(config.erd.cacheDir, name);
+        const { mtimeMs } = await stat(filePath).catch(() => ({ mtimeMs: 0 }));
+        const digest = ERD_CACHE_FILE_RE.exec(name)[1];
+        const entry = entries.get(digest) || { files: [], mtime: 0 };
+        entry.files.push(filePath);
+        entry.mtime = Math.max(entry.mtime, mtimeMs);
+        entries.set(digest, entry);
+    }));
+    if (entries.size <= config.erd.cacheMaxEntries) return;
+
+    const oldest = Array.from(entries.values())
+        .sort((a, b) => a.mtime - b.mtime)
+        .slice(0, entries.size - config.erd.cacheMaxEntries);
+    //another render may be pruning at the same time, a file that is already gone is fine..!
+    await Promise.all(oldest.flatMap(entry => entry.files.map(file => unlink(file).catch(() => {}))));
+    logger.info({ removed: oldest.length, kept: config.erd.cacheMaxEntries }, 'Pruned ERD image cache');
+}
+
+let mmdcCheck;
+
+/**
+ * Check once that the mermaid-cli binary resolves (falls back to Puppeteer if not)
+ */
+function isMmdcAvailable() {
+    if (!mmdcCheck) {
+        mmdcCheck = execFileAsync(mmdcArg(config.erd.mmdcPath), ['--version'], mmdcExecOptions)
+            .then(() => true)
+            .catch(error => {
+                logger.warn({ error: error.message, mmdcPath: config.erd.mmdcPath }, 'mmdc not available, using Puppeteer renderer');
+                return false;
+            });
+    }
+    return mmdcCheck;
+}
+
+let mmdcPuppeteerConfig;
+
+/**
+ * Write the puppeteer config for mmdc once, so its browser gets the same flags as the pool's
+ * (without --no-sandbox Chromium refuses to start as root, e.g. in containers)..!
+ */
+function getMmdcPuppeteerConfig() {
+    if (!mmdcPuppeteerConfig) {
+        const configPath = join(config.erd.cacheDir, 'puppeteer-config.json');
+        mmdcPuppeteerConfig = mkdir(config.erd.cacheDir, { recursive: true })
+            .then(() => writeFile(configPath, JSON.stringify({
+                executablePath: config.erd.executablePath,
+                args: CHROMIUM_ARGS,
+            }), 'utf-8'))
+            .then(() => configPath)
+            .catch(error => {
+                mmdcPuppeteerConfig = null;//try again on the next render..!
+                throw error;
+            });
+    }
+    return mmdcPuppeteerConfig;
+}
+
+/**
+ * Render ERD images (PNG, SVG, PDF) with the mermaid-cli, one process per format
+ */
+async function renderERDImagesWithMmdc(fileId, mermaidContent, outputs) {
+    //mmdc reads the diagram from disk, same file saveMermaidERD writes..!
+    const mmdPath = join(path.dirname(outputs.svg), 'erd.mmd');
+    const [puppeteerConfigPath] = await Promise.all([
+        getMmdcPuppeteerConfig(),
+        writeFile(mmdPath, mermaidContent, 'utf-8'),
+    ]);
+
+    await Promise.all(Object.values(outputs).map(async outputPath => {
+        await execFileAsync(
+            mmdcArg(config.erd.mmdcPath),
+            ['-i', mmdPath, '-o', outputPath, '-b', 'transparent', '-p', puppeteerConfigPath].map(mmdcArg),
+            { ...mmdcExecOptions, timeout: 30000 }
+        );
+        logger.info({ fileId, path: outputPath }, 'ERD image saved (mmdc)');
+    }));
+}
+
+/**
+ * Run one export step, failing it if it takes longer than ms (so one stuck format can't hang the render)
+ */
+function withTimeout(task, ms, label) {
+    let timer;
+    const timeout = new Promise((_, reject) => {
+        timer = setTimeout(() => reject(new Error(`${label} export timed out after ${ms} ms`)), ms);
+    });
+    return Promise.race([task(), timeout]).finally(() => clearTimeout(timer));
+}
+
+/**
+ * Render ERD images (PNG, SVG, PDF) using Puppeteer
+ */
+async function renderERDImages(fileId, mermaidContent, outputs, getBrowser) {
+    let browser;
+    let context;
+
+    try {
+        //borrow a warm browser from the pool (or the batch's browser) instead of launching a new one..!
+        browser = getBrowser ? await getBrowser() : await browserPool.acquire();
+        //a fresh context per render keeps renders isolated and is cheap to throw away..!
+        context = await browser.createBrowserContext();
+        const page = await context.newPage();//Try to open the new page..!
         await page.setViewport({ width: 1920, height: 1080 });//set the viewport..!
         
         //create the html with mermaid..!
         const html = createMermaidHTML(mermaidContent);
         //the page will set the content of the mermaidContent..!
-        await page.setContent(html, { waitUntil: 'networkidle0' });
-
-        // Wait for Mermaid to render
-        await page.waitForSelector('#mermaid-diagram svg', {
-            timeout: 30000,
-        });
-        //maek the path file here..!
-        const artifacts = join(config.storage.artifactsDir, fileId);
-
-
-        //get-Svg-content..!
-        const svgContent = await page.evaluate(() => {
-            //evaluate the page..!
-            const svg = document.querySelector('#mermaid-diagram svg');//means the svg is there..!
-            //if the svg is there get the html or else null;!
-            return svg ? svg.outerHTML : null;
-        });
-        if (!svgContent) {
-            throw new Error('Failed to render Mermaid diagram');
-        }
+        //no need to wait for the network: Mermaid is inlined and the SVG wait below is the real signal..!
+        await page.setContent(html, { waitUntil: 'domcontentloaded' });
 
-        //SAVE THE SVG..!
-        const svgPath = join(artifacts, 'erd.svg');
-        //we will save at the artifacts location with the name erd.svg....!
-        await writeFile(svgPath, svgContent, 'utf-8');
-        //the utf means encoding..!
-        logger.info({
-            fileId: fileId,
-            path: svgPath
-        }, "ERD-SVG-Saved-Successfully..!")
+        // Wait until Mermaid has actually laid out the diagram (svg present with a real size)
+        await page.waitForFunction(() => {
+            const svg = document.querySelector('#mermaid-diagram svg');
+            return svg && svg.getBBox().width > 0;
+        }, { timeout: 30000 });
 
 
-        // Generate PNG
+        //each export gets its own time budget, SVG only reads the markup so it runs alongside PNG/PDF..!
+        //PDF waits for the PNG: page.pdf() switches the page to print layout, which would move the screenshot's box..!
+        //the first failure/timeout rejects right away, closing the context below cancels the other exports..!
+        const timeout = config.erd.formatTimeoutMs;
         const element = await page.$('#mermaid-diagram svg');
-        const pngPath = join(artifacts, 'erd.png');
-        await element.screenshot({ path: pngPath, omitBackground: true });
-        logger.info({ fileId, path: pngPath }, 'PNG saved');
-
-        //generate pdf..!
-        const pdfPath = join(artifacts, "erd.pdf");
-        await page.pdf({
-            path: pdfPath,
-            format: "A4",
-            landscape: true,
-            printBackground: true
-        });
-        logger.info({
-            fileId: fileId,
-            path: pdfPath,
-        }, "Pdf-Saved");
-
-
-        return {
-            svg: svgPath,
-            png: pngPath,
-            pdf: pdfPath,
+        await Promise.all([
+            withTimeout(async () => {
+                await element.screenshot({ path: outputs.png, omitBackground: true });
+                logger.info({ fileId, path: outputs.png }, 'PNG saved');
+            }, timeout, 'PNG').then(() => withTimeout(async () => {
+                //one page exactly the size of the diagram (+ the body padding), no A4 pagination..!
+                const size = await page.evaluate(() => {
+                    const rect = document.querySelector('#mermaid-diagram svg').getBoundingClientRect();
+                    return { width: Math.ceil(rect.width) + 40, height: Math.ceil(rect.height) + 40 };
+                });
+                await page.pdf({
+                    path: outputs.pdf,
+                    width: `${size.width}px`,
+                    height: `${size.height}px`,
+                    pageRanges: '1',
+                    printBackground: true
+                });
+                logger.info({
+                    fileId: fileId,
+                    path: outputs.pdf,
+                }, "Pdf-Saved");
+            }, timeout, 'PDF')),
+
+            withTimeout(async () => {
+                //get-Svg-content..!
+                const svgContent = await page.evaluate(() => {
+                    const svg = document.querySelector('#mermaid-diagram svg');//means the svg is there..!
+                    //if the svg is there get the html or else null;!
+                    return svg ? svg.outerHTML : null;
+                });
+                if (!svgContent) {
+                    throw new Error('Failed to render Mermaid diagram');
+                }
+
+                //SAVE THE SVG..!
+                //we will save at the artifacts location with the name erd.svg....!
+                await writeFile(outputs.svg, svgContent, 'utf-8');
+                //the utf means encoding..!
+                logger.info({
+                    fileId: fileId,
+                    path: outputs.svg
+                }, "ERD-SVG-Saved-Successfully..!")
+            }, timeout, 'SVG'),
+        ]);
+    } finally {
+        //close only the context, the browser goes back to the pool..!
+        if (context) {
+            await context.close().catch(() => {});
+        }
+        if (browser && !getBrowser) {
+            browserPool.release(browser);
+        }
+    }
+}
 
+/**
+ * Generate ERD images for many uploads on one browser, a few pages at a time
+ * @param {Array<{fileId: string, mermaidContent: string}>} items - Diagrams to render
+ * @returns {Promise<Array>} One { fileId, images } or { fileId, error } per item (same order)
+ */
+export async function generateERDImagesBatch(items, { concurrency = config.erd.batchConcurrency } = {}) {
+    const results = new Array(items.length);
+    let browser = null;
+    let uses = 0;//renders served by the current browser, handed back to the pool on release..!
+    let acquiring = null;
+    let next = 0;
+
+    const swapBrowser = async () => {
+        if (browser) {
+            //crashed mid-batch: give it back so the pool recycles it..!
+            browserPool.release(browser, { uses });
+            browser = null;
         }
-    } catch (error) {
-        logger.error({
-            error: error.message,
-            fileId: fileId,
-        }, 'Failed-to-Generate-ERD-Images..!')
-        throw error;
+        uses = 0;
+        browser = await browserPool.acquire();
+    };
+
+    //borrow the browser only once a diagram really needs Puppeteer (cache hits and mmdc never do)..!
+    const getBrowser = async () => {
+        while (!browser || !browser.connected) {
+            if (!acquiring) {
+                acquiring = swapBrowser().finally(() => { acquiring = null; });
+            }
+            await acquiring;
+        }
+        uses++;
+        return browser;
+    };
+
+    //each worker keeps taking the next diagram until the list is empty..!
+    const worker = async () => {
+        while (next < items.length) {
+            const index = next++;
+            const { fileId, mermaidContent } = items[index];
+            try {
+                const images = await generateERDImages(fileId, mermaidContent, { getBrowser });
+                results[index] = { fileId, images };
+            } catch (error) {
+                results[index] = { fileId, error: error.message };
+            }
+        }
+    };
+
+    try {
+        //at least one worker, or nothing would be rendered and results would stay empty..!
+        const workers = Math.min(Math.max(1, Math.floor(concurrency) || 1), items.length);
+        logger.info({ count: items.length, concurrency: workers }, 'Generating ERD images in batch');
+        await Promise.all(Array.from({ length: workers }, worker));
     } finally {
-        //if the puppeter is there then close it..!
         if (browser) {
-            await browser.close();
+            browserPool.release(browser, { uses });
         }
     }
+
+    return results;
 }
 
-/**
- * Create HTML with Mermaid diagram
- */
-function createMermaidHTML(mermaidContent) {
-    return `
+//static parts of the render page, built once (they hold the whole inlined Mermaid bundle)..!
+let mermaidPage;
+
+function getMermaidPage() {
+    if (!mermaidPage) {
+        mermaidPage = {
+            prefix: `
 <!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
-    <script type="module">
-        import mermaid from 'https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.esm.min.mjs';
-        mermaid.initialize({ 
-            startOnLoad: true,
-            theme: 'default',
-            er: {
-                fontSize: 14,
-                useMaxWidth: true
-            }
-        });
-    </script>
+    ${getMermaidScript().html}
     <style>
         body {
             margin: 0;
@@ -269,12 +599,24 @@ function createMermaidHTML(mermaidContent) {
 <body>
     <div id="mermaid-diagram">
         <pre class="mermaid">
-${mermaidContent}
+`,
+            suffix: `
         </pre>
     </div>
 </body>
 </html>
-    `;
+    `,
+        };
+    }
+    return mermaidPage;
+}
+
+/**
+ * Create HTML with Mermaid diagram
+ */
+function createMermaidHTML(mermaidContent) {
+    const { prefix, suffix } = getMermaidPage();
+    return prefix + mermaidContent + suffix;
 }
 
 /**
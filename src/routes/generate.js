@@ -7,10 +7,74 @@ import express from 'express';
 import logger from '../utils/logger.js';
 import { getMetadata } from '../storage/fileStorage.js';
 import { generateDBML, saveDBML } from '../generators/dbmlGenerator.js';
-import { generateMermaidERD, generateERDImages, saveMermaidERD } from '../generators/erdGenerator.js';
+import { generateMermaidERD, generateERDImages, generateERDImagesBatch, saveMermaidERD } from '../generators/erdGenerator.js';
 
 const router = express.Router();
 
+/**
+ * POST /generate/batch
+ * Generate Mermaid ERDs and ERD images for several files, sharing one browser
+ * Body: { "fileIds": ["<fileId>", ...] }
+ */
+router.post('/batch', async (req, res) => {
+    const fileIds = req.body?.fileIds;
+    
+    if (!Array.isArray(fileIds) || fileIds.length === 0) {
+        return res.status(400).json({
+            error: 'Bad-Request',
+            message: 'Body must contain a non-empty "fileIds" array'
+        });
+    }
+    
+    try {
+        logger.info({ count: fileIds.length }, 'Starting batch ERD generation...');
+        
+        // Step 1: Build the Mermaid ERD for every file
+        // results are filled by input index, so they come back in fileIds order
+        const items = [];
+        const indexes = [];
+        const results = new Array(fileIds.length);
+        for (const [index, fileId] of fileIds.entries()) {
+            try {
+                const metadata = await getMetadata(fileId);
+                const mermaidContent = await generateMermaidERD(metadata);
+                await saveMermaidERD(fileId, mermaidContent);
+                items.push({ fileId, mermaidContent });
+                indexes.push(index);
+            } catch (error) {
+                results[index] = { fileId, error: error.message };
+            }
+        }
+        
+        // Step 2: Render all the images on one shared browser
+        if (items.length > 0) {
+            const rendered = await generateERDImagesBatch(items);
+            rendered.forEach((result, i) => {
+                results[indexes[i]] = result;
+            });
+        }
+        
+        const errorCount = results.filter(result => result.error).length;
+        const status = errorCount === 0 ? 'success' : 'partial';
+        
+        logger.info({ count: fileIds.length, status, errorCount }, 'Batch ERD generation complete');
+        
+        res.status(errorCount === 0 ? 200 : 207).json({
+            status,
+            message: `Generated ERD images for ${results.length - errorCount} of ${fileIds.length} files`,
+            results
+        });
+        
+    } catch (error) {
+        logger.error({ error: error.message, stack: error.stack }, 'Batch ERD generation failed');
+        
+        res.status(500).json({
+            error: 'Internal-Server-Error',
+            message: error.message
+        });
+    }
+});
+
 /**
  * POST /generate/:fileId
  * Automatically generate DBML and ERD images for uploaded file
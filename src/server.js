@@ -10,6 +10,7 @@ import config from "./config/index.js";
 import uploadRouter from "./middleware/upload.js";
 import generateRouter from "./routes/generate.js";//for generating the artifacts..!
 import { Initializellm, getLLMStatus } from "./llm/index.js";
+import browserPool from "./utils/browserPool.js";
 
 
 //Create the instance of the express.!
@@ -104,6 +105,16 @@ app.listen(PORT, async () => {
         logger.info('✅ Artifacts directory created');
     }
     
+    // Warm up the ERD browser pool (optional - renders will retry on demand)
+    // mmdc launches its own browser, the pool only starts if a render falls back to Puppeteer
+    if (config.erd.renderer !== "mmdc") {
+        try {
+            await browserPool.start();
+        } catch (err) {
+            logger.warn({ error: err.message }, "⚠️ Browser pool not started - ERD images will launch on first render");
+        }
+    }
+    
     // Initialize LLM on startup (optional - won't crash if model missing)
     try {
         logger.info("🧠 Initializing LLM...");
@@ -116,4 +127,15 @@ app.listen(PORT, async () => {
     }
 });
 
+/**
+ * Graceful-Shutdown: close the pooled browsers before exiting..!
+ */
+for (const signal of ["SIGINT", "SIGTERM", "SIGHUP"]) {
+    process.once(signal, async () => {
+        logger.info({ signal }, "Shutting down...");
+        await browserPool.close().catch(() => {});
+        process.exit(0);
+    });
+}
+
 export default app;
\ No newline at end of file
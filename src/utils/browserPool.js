@@ -0,0 +1,201 @@
+/**
+ * @Module Browser Pool
+ * @Description Keep a few headless browsers warm so ERD rendering doesn't pay
+ * the browser cold-start on every request..!
+ */
+
+import puppeteer from 'puppeteer';
+import logger from './logger.js';
+import config from '../config/index.js';
+
+export class BrowserPool {
+    constructor({ size, recycleAfter, launchOptions }) {
+        if (!(size >= 1) || !(recycleAfter >= 1)) {
+            throw new Error(`Browser pool needs size and recycleAfter >= 1 (got ${size}, ${recycleAfter})`);
+        }
+        this.size = size;
+        this.recycleAfter = recycleAfter;
+        this.launchOptions = launchOptions;
+        this.idle = [];//browsers ready to be handed out..!
+        this.waiters = [];//callers waiting for a free browser..!
+        this.useCounts = new Map();//browser -> number of renders it has served..!
+        this.starting = null;//shared launch promise, so the pool is only started once..!
+        this.closed = false;//set by close(), nothing is launched again until restart()..!
+    }
+
+    /**
+     * Launch all the browsers of the pool (at service start, or lazily on first acquire)
+     */
+    start() {
+        if (this.closed) {
+            return Promise.reject(new Error('Browser pool closed'));
+        }
+        if (!this.starting) {
+            this.starting = this.launchAll();
+        }
+        return this.starting;
+    }
+
+    async launchAll() {
+        const launched = await Promise.allSettled(
+            Array.from({ length: this.size }, () => this.launch())
+        );
+        const failed = launched.find(result => result.status === 'rejected');
+        if (failed) {
+            //don't leave half a pool behind, the next acquire() will try again..!
+            await this.shutdown(failed.reason);
+            throw failed.reason;
+        }
+        for (const { value: browser } of launched) {
+            this.release(browser, { uses: 0 });
+        }
+        if (this.closed) {
+            throw new Error('Browser pool closed');
+        }
+        logger.info({ size: this.size, recycleAfter: this.recycleAfter }, 'Browser pool started');
+    }
+
+    async launch() {
+        const browser = await puppeteer.launch(this.launchOptions);
+        this.useCounts.set(browser, 0);
+        return browser;
+    }
+
+    /**
+     * Get a browser from the pool (waits if all of them are busy)
+     */
+    async acquire() {
+        await this.start();
+        while (this.idle.length > 0) {
+            const browser = this.idle.shift();
+            if (browser.connected) {
+                return browser;
+            }
+            //crashed while idle: replace it (the fresh one goes to the waiters) and keep looking..!
+            this.recycle(browser, this.useCounts.get(browser) || 0);
+        }
+        return new Promise((resolve, reject) => this.waiters.push({ resolve, reject }));
+    }
+
+    /**
+     * Give the browser back, recycling it after too many uses or if it crashed..!
+     * @param {Object} [options]
+     * @param {number} [options.uses=1] - Renders served since it was acquired (a batch serves many)
+     */
+    release(browser, { uses: served = 1 } = {}) {
+        if (this.closed) {
+            //shutting down: never hand out or relaunch, just make sure it's gone..!
+            this.useCounts.delete(browser);
+            browser.close().catch(() => {});
+            return;
+        }
+        const uses = (this.useCounts.get(browser) || 0) + served;
+        this.useCounts.set(browser, uses);
+
+        if (uses >= this.recycleAfter || !browser.connected) {
+            this.recycle(browser, uses);
+            return;
+        }
+
+        const waiter = this.waiters.shift();
+        if (waiter) {
+            waiter.resolve(browser);
+        } else {
+            this.idle.push(browser);
+        }
+    }
+
+    async recycle(browser, uses) {
+        this.useCounts.delete(browser);
+        logger.info({ uses }, 'Recycling pooled browser');
+        await browser.close().catch(() => {});
+        if (this.closed) {
+            return;
+        }
+
+        try {
+            const fresh = await this.launch();
+            this.release(fresh, { uses: 0 });
+        } catch (error) {
+            logger.error({ error: error.message }, 'Failed to relaunch pooled browser');
+            //if nothing is left, reset so the next acquire() starts a fresh pool..!
+            if (this.useCounts.size === 0) {
+                await this.shutdown(error);
+            }
+        }
+    }
+
+    /**
+     * Close every browser in the pool for good (pending and later acquire() calls are rejected)
+     */
+    async close(reason = new Error('Browser pool closed')) {
+        this.closed = true;
+        await this.shutdown(reason);
+    }
+
+    /**
+     * Start the pool again after close()
+     */
+    restart() {
+        this.closed = false;
+        return this.start();
+    }
+
+    /**
+     * Close every browser and reset the pool, so the next acquire() launches it again
+     */
+    async shutdown(reason) {
+        const browsers = Array.from(this.useCounts.keys());
+        for (const waiter of this.waiters.splice(0)) {
+            waiter.reject(reason);
+        }
+        this.idle = [];
+        this.useCounts.clear();
+        this.starting = null;
+        await Promise.all(browsers.map(browser => browser.close().catch(() => {})));
+    }
+
+    /**
+     * Synchronously kill the browser processes (for the process 'exit' hook)
+     */
+    kill() {
+        for (const browser of this.useCounts.keys()) {
+            browser.process()?.kill('SIGKILL');
+        }
+    }
+}
+
+//rendering a static diagram needs none of these subsystems, turn them off to start faster and use less memory..!
+export const CHROMIUM_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-gpu',
+    '--disable-dev-shm-usage',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--no-first-run',
+    '--disable-features=site-per-process,TranslateUI',
+    '--mute-audio',
+];
+
+//the shared pool for the whole process..!
+const browserPool = new BrowserPool({
+    size: config.erd.browserPoolSize,
+    recycleAfter: config.erd.browserPoolRecycleAfter,
+    launchOptions: {
+        headless: true,
+        executablePath: config.erd.executablePath,
+        args: CHROMIUM_ARGS,
+        //don't let every browser install its own signal handlers, the server shuts the pool down..!
+        handleSIGINT: false,
+        handleSIGTERM: false,
+        handleSIGHUP: false,
+    },
+});
+
+//never leave orphaned browsers behind when the process goes away..!
+process.once('exit', () => browserPool.kill());
+
+export default browserPool;